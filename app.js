@@ -24,6 +24,8 @@ async function init() {
         
         console.log('Pyodide loaded successfully');
         
+        await pyodide.loadPackage('numpy');
+        
         const response = await fetch('network_settling.py');
         const pythonCode = await response.text();
         await pyodide.runPythonAsync(pythonCode);
@@ -71,6 +73,8 @@ async function loadExampleGrid() {
 }
 
 // Python API
+// Mutators return a small JSON status; step() and get_state() return a JS
+// object with flat typed arrays (see toState)
 async function createNetwork(size) {
     gridSize = size;
     const result = await pyodide.runPythonAsync(`create_network(${size})`);
@@ -89,7 +93,7 @@ async function removeClue(row, col) {
 
 async function step() {
     const result = await pyodide.runPythonAsync(`step()`);
-    return JSON.parse(result);
+    return toState(result);
 }
 
 async function reset() {
@@ -104,7 +108,31 @@ async function setInhibition(strength) {
 
 async function getState() {
     const result = await pyodide.runPythonAsync(`get_state()`);
-    return JSON.parse(result);
+    return toState(result);
+}
+
+// State arrays are flat: probabilities is a Float32Array indexed
+// [(row * N + col) * N + value], grid and clamped are Int8Arrays indexed
+// [row * N + col]. JSON strings (errors, non-Pyodide builds) are parsed
+// into the same shape.
+function toState(result) {
+    if (typeof result !== 'string') return result;
+    const state = JSON.parse(result);
+    if (state.probabilities) {
+        state.probabilities = Float32Array.from(state.probabilities);
+        state.grid = Int8Array.from(state.grid);
+        state.clamped = Int8Array.from(state.clamped);
+    }
+    return state;
+}
+
+function cellProbabilities(state, row, col) {
+    const start = (row * gridSize + col) * gridSize;
+    return state.probabilities.subarray(start, start + gridSize);
+}
+
+function isCellClamped(state, row, col) {
+    return state.clamped[row * gridSize + col] === 1;
 }
 
 // Render grid
@@ -140,8 +168,7 @@ async function handleCellClick(row, col) {
     if (isRunning) return;
     
     const state = await getState();
-    const key = `${row},${col}`;
-    const isClamped = state.clamped.some(([r, c]) => r === row && c === col);
+    const isClamped = isCellClamped(state, row, col);
     
     // Watch this cell's probabilities
     watchedCell = { row, col };
@@ -225,9 +252,9 @@ async function checkIfValidClue(row, col, value) {
     // Check row for conflicts
     for (let c = 0; c < gridSize; c++) {
         if (c === col) continue;
-        const isClamped = state.clamped.some(([r, c_]) => r === row && c_ === c);
+        const isClamped = isCellClamped(state, row, c);
         if (isClamped) {
-            const cellValue = state.grid[row][c];
+            const cellValue = state.grid[row * gridSize + c];
             if (cellValue === value) {
                 return false; // Conflict in row
             }
@@ -237,9 +264,9 @@ async function checkIfValidClue(row, col, value) {
     // Check column for conflicts
     for (let r = 0; r < gridSize; r++) {
         if (r === row) continue;
-        const isClamped = state.clamped.some(([r_, c]) => r_ === r && c === col);
+        const isClamped = isCellClamped(state, r, col);
         if (isClamped) {
-            const cellValue = state.grid[r][col];
+            const cellValue = state.grid[r * gridSize + col];
             if (cellValue === value) {
                 return false; // Conflict in column
             }
@@ -275,9 +302,8 @@ async function updateVisualization() {
     for (let row = 0; row < gridSize; row++) {
         for (let col = 0; col < gridSize; col++) {
             const cell = document.querySelector(`[data-row="${row}"][data-col="${col}"]`);
-            const key = `${row},${col}`;
-            const probs = state.probabilities[key];
-            const isClamped = state.clamped.some(([r, c]) => r === row && c === col);
+            const probs = cellProbabilities(state, row, col);
+            const isClamped = isCellClamped(state, row, col);
             
             await updateCell(cell, probs, isClamped, state);
         }
@@ -285,8 +311,8 @@ async function updateVisualization() {
     
     // Update stats
     document.getElementById('iteration').textContent = state.iteration;
-    if (state.max_change !== undefined) {
-        document.getElementById('delta').textContent = state.max_change.toFixed(4);
+    if (state.last_max_change != null) {
+        document.getElementById('delta').textContent = state.last_max_change.toFixed(4);
     }
     
     // Update network status
@@ -363,7 +389,7 @@ async function selectFirstUnclampedCell() {
     // Find first non-clamped cell
     for (let row = 0; row < gridSize; row++) {
         for (let col = 0; col < gridSize; col++) {
-            const isClamped = state.clamped.some(([r, c]) => r === row && c === col);
+            const isClamped = isCellClamped(state, row, col);
             if (!isClamped) {
                 watchedCell = { row, col };
                 const cell = document.querySelector(`[data-row="${row}"][data-col="${col}"]`);
@@ -385,10 +411,12 @@ function updateNetworkStatus(state) {
     
     let message = '';
     let statusClass = 'network-status';
+    // Change of the most recent step; unknown until one has run
+    const maxChange = state.last_max_change ?? Infinity;
     
     if (isRunning) {
         // Check if entire grid has converged (not just one cell)
-        const gridConverged = state.is_converged || state.max_change < 0.001;
+        const gridConverged = state.is_converged || maxChange < 0.001;
         
         if (gridConverged) {
             // Entire grid converged - flash green!
@@ -397,8 +425,7 @@ function updateNetworkStatus(state) {
         } else {
             // Still settling - auto-switch to uncertain cells
             if (watchedCell) {
-                const key = `${watchedCell.row},${watchedCell.col}`;
-                const probs = state.probabilities[key];
+                const probs = cellProbabilities(state, watchedCell.row, watchedCell.col);
                 const maxProb = Math.max(...probs);
                 
                 // If watched cell is confident, find another uncertain one
@@ -427,10 +454,10 @@ function updateNetworkStatus(state) {
                 } else if (state.iteration < 5) {
                     message = `Iteration ${state.iteration}: Units are sending inhibitory signals to conflicting values in same row/column.`;
                     statusClass = 'network-status active';
-                } else if (state.max_change > 0.01) {
+                } else if (maxChange > 0.01) {
                     message = `Iteration ${state.iteration}: Probabilities adjusting as conflicts resolve. High-confidence values suppress alternatives.`;
                     statusClass = 'network-status active';
-                } else if (state.max_change > 0.001) {
+                } else if (maxChange > 0.001) {
                     message = `Iteration ${state.iteration}: Network stabilizing... Changes getting smaller as solution emerges.`;
                     statusClass = 'network-status active stabilizing';
                 } else {
@@ -442,7 +469,7 @@ function updateNetworkStatus(state) {
     } else if (state.iteration === 0) {
         message = '👆 Try entering different values in the grid. When ready, press "Watch it settle" to see the network solve it.';
         statusClass = 'network-status';
-    } else if (state.is_converged || state.max_change < 0.001) {
+    } else if (state.is_converged || maxChange < 0.001) {
         message = `✓ Grid Converged! Network found stable solution after ${state.iteration} iterations.`;
         statusClass = 'network-status converged';
     } else {
@@ -461,10 +488,9 @@ function findNextUncertainCell(state) {
     
     for (let row = 0; row < gridSize; row++) {
         for (let col = 0; col < gridSize; col++) {
-            const isClamped = state.clamped.some(([r, c]) => r === row && c === col);
+            const isClamped = isCellClamped(state, row, col);
             if (!isClamped) {
-                const key = `${row},${col}`;
-                const probs = state.probabilities[key];
+                const probs = cellProbabilities(state, row, col);
                 const maxProb = Math.max(...probs);
                 
                 if (maxProb < lowestConfidence) {
@@ -497,9 +523,8 @@ function updateProbabilityPanel(state) {
     if (!watchedCell) return;
     
     const viz = document.getElementById('probabilityViz');
-    const key = `${watchedCell.row},${watchedCell.col}`;
-    const probs = state.probabilities[key];
-    const isClamped = state.clamped.some(([r, c]) => r === watchedCell.row && c === watchedCell.col);
+    const probs = cellProbabilities(state, watchedCell.row, watchedCell.col);
+    const isClamped = isCellClamped(state, watchedCell.row, watchedCell.col);
     
     const maxProb = Math.max(...probs);
     const hasStarted = state.iteration > 0;
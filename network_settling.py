@@ -4,8 +4,233 @@ Implements parallel constraint satisfaction using connectionist principles
 Based on cognitive science lecture on connections and constraint satisfaction
 """
 
+import heapq
 import json
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Not available under Pyodide; step() falls back to plain NumPy
+    njit = None
+
+try:
+    from js import Object
+    from pyodide.ffi import to_js
+except ImportError:
+    # Outside Pyodide the API functions return JSON strings instead
+    to_js = None
+
+
+# Sweep residual of a cell that is not settled. Kept finite because the
+# kernels are compiled with fastmath, which lets LLVM assume no operand of
+# a comparison is infinite
+_UNSETTLED = np.finfo(np.float32).max
+
+
+def _value_bits(grid_size: int) -> np.ndarray:
+    """Bit for each value index in a uint64 impossible-value mask."""
+    return np.left_shift(np.uint64(1), np.arange(grid_size, dtype=np.uint64))
+
+
+def _settle_numpy(probs, clamped_mask, active, impossible, row_sum, col_sum,
+                  live_in_row, live_in_col, residual, eps, inhib_strength, out):
+    """
+    Compute one synchronous settling sweep with NumPy array operations.
+    
+    Every unclamped cell is updated from the previous iteration's
+    probabilities and written to `out` where `active` is set; other
+    cells are copied. Returns the maximum change over the unclamped
+    cells' updates, written or not. With `eps` > 0, cells whose
+    `residual` (last change) is below it are settled: they are copied
+    and not counted, and each written cell's change is stored in
+    `residual`.
+    
+    `row_sum` and `col_sum` hold each value's total over the unclamped
+    cells of a row/column and are advanced by the written deltas;
+    `live_in_row` and `live_in_col` count those cells.
+    
+    The update is built up in place in `out` to avoid full-size
+    temporaries; half-precision storage goes through a float32 work
+    buffer so sums and products are accumulated in float32.
+    """
+    work = out if out.dtype.itemsize >= 4 else np.empty(out.shape, np.float32)
+    
+    # Inhibition: average activation of each value among the other
+    # unclamped cells in the same row and column
+    count = (live_in_row[:, None] + live_in_col[None, :] - 2)
+    count = count[:, :, None].astype(np.float32)
+    scale = np.divide(
+        np.float32(inhib_strength), count,
+        out=np.zeros_like(count), where=count > 0
+    )
+    np.add(row_sum[:, None, :], col_sum[None, :, :], out=work)
+    work -= probs
+    work -= probs
+    
+    # Apply inhibition to reduce probability
+    work *= scale
+    np.subtract(1, work, out=work)
+    work *= probs
+    
+    # Impossible values (clamped elsewhere in row/col) get probability 0
+    np.putmask(work, (impossible[:, :, None] & _value_bits(probs.shape[0])) != 0, 0.0)
+    np.maximum(work, 0.0, out=work)
+    
+    # Normalize, falling back to uniform where every value was ruled out
+    total = work.sum(axis=2, keepdims=True)
+    np.divide(work, total, out=work, where=total > 0)
+    work[total[:, :, 0] == 0] = 1.0 / probs.shape[0]
+    if work is not out:
+        out[...] = work
+    
+    # Clamped cells keep their values
+    out[clamped_mask] = probs[clamped_mask]
+    
+    delta = np.subtract(out, probs, dtype=row_sum.dtype)
+    change = np.abs(delta).max(axis=2)
+    frozen = ~active
+    if eps > 0:
+        settled = residual < eps
+        change[settled] = 0.0
+        frozen |= settled
+    max_change = change.max()
+    if frozen.any():
+        out[frozen] = probs[frozen]
+        delta[frozen] = 0.0
+    if eps > 0:
+        written = ~(frozen | clamped_mask)
+        residual[written] = change[written]
+    row_sum += delta.sum(axis=1)
+    col_sum += delta.sum(axis=0)
+    return max_change
+
+
+if njit is not None:
+    @njit(inline='always')
+    def _settle_body(probs, clamped_mask, active, impossible, row_sum, col_sum,
+                     live_in_row, live_in_col, residual, eps, inhib_strength,
+                     out, n):
+        """Numba version of _settle_numpy, parallel over rows, for grid size n."""
+        # float32 copies of the totals and one bit per value keep the
+        # per-cell value loops in single precision and free of branches,
+        # so LLVM can vectorize them (8 float32 lanes with AVX2)
+        row_sum32 = row_sum.astype(np.float32)
+        col_sum32 = col_sum.astype(np.float32)
+        value_bits = np.empty(n, dtype=np.uint64)
+        for v in range(n):
+            value_bits[v] = np.uint64(1) << np.uint64(v)
+        zero = np.float32(0.0)
+        one = np.float32(1.0)
+        skip = eps > 0
+        
+        row_max = np.zeros(n, dtype=np.float32)
+        for r in prange(n):
+            # Only this row's cells read row_sum[r], so its delta can be
+            # applied once the row is done; col_sum is shared until the end
+            row_delta = np.zeros(n)
+            for c in range(n):
+                # Clamped and settled cells keep their values; residuals
+                # are only read and stored when skipping is enabled
+                if clamped_mask[r, c] or (skip and residual[r, c] < eps):
+                    for v in range(n):
+                        out[r, c, v] = probs[r, c, v]
+                    continue
+                
+                count = live_in_row[r] + live_in_col[c] - 2
+                scale = zero
+                if count > 0:
+                    scale = np.float32(inhib_strength / count)
+                bits = impossible[r, c]
+                
+                # Inhibit and clip, accumulating the normalizer as we go
+                total = zero
+                for v in range(n):
+                    p = probs[r, c, v]
+                    x = p * (one - (row_sum32[r, v] + col_sum32[c, v] - 2 * p) * scale)
+                    x = max(x, zero) if (bits & value_bits[v]) == 0 else zero
+                    out[r, c, v] = x
+                    total += x
+                
+                # Normalize and track the change in the same pass
+                change = zero
+                if total > 0:
+                    inv_total = one / total
+                    for v in range(n):
+                        x = out[r, c, v] * inv_total
+                        out[r, c, v] = x
+                        change = max(change, abs(x - probs[r, c, v]))
+                else:
+                    for v in range(n):
+                        x = one / n
+                        out[r, c, v] = x
+                        change = max(change, abs(x - probs[r, c, v]))
+                row_max[r] = max(row_max[r], change)
+                
+                if not active[r, c]:
+                    for v in range(n):
+                        out[r, c, v] = probs[r, c, v]
+                    continue
+                if skip:
+                    residual[r, c] = change
+                for v in range(n):
+                    row_delta[v] += np.float64(out[r, c, v]) - np.float64(probs[r, c, v])
+            for v in range(n):
+                row_sum[r, v] += row_delta[v]
+        
+        # Cells that were not written back have a zero delta
+        for c in prange(n):
+            for r in range(n):
+                for v in range(n):
+                    col_sum[c, v] += np.float64(out[r, c, v]) - np.float64(probs[r, c, v])
+        
+        return row_max.max()
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _settle_kernel(probs, clamped_mask, active, impossible, row_sum, col_sum,
+                       live_in_row, live_in_col, residual, eps, inhib_strength,
+                       out):
+        """Settling kernel for any grid size."""
+        return _settle_body(
+            probs, clamped_mask, active, impossible, row_sum, col_sum,
+            live_in_row, live_in_col, residual, eps, inhib_strength, out,
+            probs.shape[0]
+        )
+    
+    def _make_sized_kernel(n):
+        """
+        Build a settling kernel with the grid size fixed at compile time, so
+        the per-cell value loops have a constant trip count and can be fully
+        unrolled and kept in registers.
+        """
+        @njit(parallel=True, fastmath=True, cache=True)
+        def kernel(probs, clamped_mask, active, impossible, row_sum, col_sum,
+                   live_in_row, live_in_col, residual, eps, inhib_strength,
+                   out):
+            return _settle_body(
+                probs, clamped_mask, active, impossible, row_sum, col_sum,
+                live_in_row, live_in_col, residual, eps, inhib_strength, out,
+                n
+            )
+        return kernel
+    
+    # Grid sizes that get a specialized kernel when the module runs outside
+    # the browser (Pyodide has no Numba, so the frontend never uses these).
+    # 4 is the frontend's grid; 6, 9 and 16 are the usual Sudoku-style
+    # puzzle sizes. Other sizes use _settle_kernel. Each is compiled on
+    # first use.
+    _KERNELS = {n: _make_sized_kernel(n) for n in (4, 6, 9, 16)}
+    _settle = _settle_kernel
+else:
+    _KERNELS = {}
+    _settle = _settle_numpy
 
 
 class NetworkSettling:
@@ -14,34 +239,96 @@ class NetworkSettling:
     parallel activation updates with inhibitory connections.
     """
     
-    def __init__(self, grid_size: int):
+    def __init__(self, grid_size: int, dtype=np.float32):
         """
         Initialize the network with a given grid size.
         
         Args:
             grid_size: Size of the grid (e.g., 4 for 4x4)
+            dtype: Storage type for probabilities; np.float16 halves memory
+                traffic again at the cost of precision
         """
+        if grid_size > 64:
+            raise ValueError("grid_size must be at most 64")
         self.grid_size = grid_size
-        self.probabilities: Dict[Tuple[int, int], List[float]] = {}
-        self.clamped: Set[Tuple[int, int]] = set()
+        self.dtype = np.dtype(dtype)
+        # probs[row, col, value_idx] holds the activation of each unit;
+        # clamped_mask[row, col] marks cells fixed by a clue
+        self.probs = np.full(
+            (grid_size, grid_size, grid_size), 1.0 / grid_size, dtype=self.dtype
+        )
+        # step() writes the next iteration here and swaps it with probs
+        self._probs_back = np.empty_like(self.probs)
+        # Per-value totals over the unclamped cells of each row/column; the
+        # sweep keeps them current, clue changes recompute them
+        self._row_sum = np.zeros((grid_size, grid_size))
+        self._col_sum = np.zeros((grid_size, grid_size))
+        # clamped_mask is a view onto a bytearray, so scalar checks can index
+        # the bytes directly instead of going through NumPy
+        self._clamped_bytes = bytearray(grid_size * grid_size)
+        self.clamped_mask = np.frombuffer(self._clamped_bytes, dtype=bool).reshape(
+            grid_size, grid_size
+        )
+        # Number of unclamped cells in each row/column
+        self._live_in_row = np.full(grid_size, grid_size, dtype=np.int64)
+        self._live_in_col = np.full(grid_size, grid_size, dtype=np.int64)
+        # Bit value_idx of _impossible[row, col] is set when the value is
+        # clamped at another cell of the row/column, clues included (a
+        # clue's own value stays clear); only changes when clues change
+        self._impossible = np.zeros((grid_size, grid_size), dtype=np.uint64)
         self.iteration = 0
         self.convergence_threshold = 0.001
         self.inhibition_strength = 0.5  # 0 to 1
         self.is_converged = False
+        self._last_max_change = np.inf
+        # 'synchronous' updates every cell from the previous iteration;
+        # 'random' does the same for a random update_fraction of the cells;
+        # 'residual' updates cells in place, largest pending change first
+        self.schedule = 'synchronous'
+        self.update_fraction = 0.5
+        self.residual_batch = None  # cells per residual step; None = all unclamped
+        self._rng = np.random.default_rng()
+        self._all_active = np.ones((grid_size, grid_size), dtype=bool)
+        # Max-heap (negated) of (residual, row, col), rebuilt lazily
+        self._residual = np.zeros((grid_size, grid_size))
+        self._residual_heap = None
+        # With skip_settled, sweeps skip cells whose last change was below
+        # convergence_threshold / 10 until a cell in their row/column moves
+        # more than that. Off by default: on typical puzzles fewer than a
+        # tenth of the cells qualify, which does not cover the bookkeeping.
+        self.skip_settled = False
+        self._sweep_residual = np.full((grid_size, grid_size), _UNSETTLED, dtype=np.float32)
         
         self.initialize()
+        
+        # Numba has no float16 support, so half precision uses NumPy
+        if self.dtype == np.float16:
+            self._settle = _settle_numpy
+        else:
+            self._settle = _KERNELS.get(grid_size, _settle)
+        if self._settle is not _settle_numpy:
+            # Compile the kernel now rather than on the first step
+            self._settle(
+                self.probs, self.clamped_mask, self._all_active, self._impossible,
+                self._row_sum.copy(), self._col_sum.copy(),
+                self._live_in_row, self._live_in_col,
+                self._sweep_residual.copy(), 0.0,
+                self.inhibition_strength, self._probs_back
+            )
     
     def initialize(self):
         """Initialize probability distributions for all cells."""
-        uniform_prob = 1.0 / self.grid_size
-        
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                # Initialize with uniform distribution
-                self.probabilities[(row, col)] = [uniform_prob] * self.grid_size
+        # Initialize with uniform distribution
+        self.probs.fill(1.0 / self.grid_size)
+        self._update_sums()
         
         self.iteration = 0
+        self._unsettle()
+    
+    def _unsettle(self):
+        """Clear convergence after the clues change so step() runs again."""
         self.is_converged = False
+        self._last_max_change = np.inf
     
     def set_clue(self, row: int, col: int, value: int):
         """
@@ -52,20 +339,63 @@ class NetworkSettling:
             col: Column index (0-indexed)
             value: Value to clamp (1-indexed, e.g., 1-4 for 4x4 grid)
         """
-        probs = [0.0] * self.grid_size
-        probs[value - 1] = 1.0  # value is 1-indexed, array is 0-indexed
-        self.probabilities[(row, col)] = probs
-        self.clamped.add((row, col))
+        was_clamped = self._clamped_bytes[row * self.grid_size + col]
+        self.probs[row, col] = 0.0
+        self.probs[row, col, value - 1] = 1.0  # value is 1-indexed, array is 0-indexed
+        self._clamped_bytes[row * self.grid_size + col] = 1
+        
+        if was_clamped:
+            # The old value may no longer be ruled out elsewhere
+            self._update_impossible()
+        else:
+            self._mark_impossible(row, col, value - 1)
+            self._live_in_row[row] -= 1
+            self._live_in_col[col] -= 1
+        self._update_sums()
+        self._unsettle()
     
     def remove_clue(self, row: int, col: int):
         """Remove a clue from a cell."""
-        self.clamped.discard((row, col))
-        uniform_prob = 1.0 / self.grid_size
-        self.probabilities[(row, col)] = [uniform_prob] * self.grid_size
+        if self._clamped_bytes[row * self.grid_size + col]:
+            self._live_in_row[row] += 1
+            self._live_in_col[col] += 1
+        self._clamped_bytes[row * self.grid_size + col] = 0
+        self.probs[row, col] = 1.0 / self.grid_size
+        self._update_impossible()
+        self._update_sums()
+        self._unsettle()
+    
+    def _mark_impossible(self, row: int, col: int, value_idx: int):
+        """Rule out a clamped cell's value for the rest of its row/column."""
+        bit = np.uint64(1) << np.uint64(value_idx)
+        # The clue's own cell keeps what other clues ruled out for it, but
+        # its own value is not ruled out, matching the other cells' checks
+        own = self._impossible[row, col]
+        self._impossible[row, :] |= bit
+        self._impossible[:, col] |= bit
+        self._impossible[row, col] = own
+    
+    def _update_impossible(self):
+        """Rebuild the impossible-value mask from the current clues."""
+        self._impossible.fill(0)
+        for row, col in np.argwhere(self.clamped_mask):
+            self._mark_impossible(row, col, self._argmax(row, col) - 1)
+    
+    def _update_sums(self):
+        """Recompute the row/column value totals over unclamped cells."""
+        live_probs = self.probs * ~self.clamped_mask[:, :, None]
+        live_probs.sum(axis=1, out=self._row_sum)
+        live_probs.sum(axis=0, out=self._col_sum)
+        self._residual_heap = None
+        self._sweep_residual.fill(_UNSETTLED)
     
     def is_clamped(self, row: int, col: int) -> bool:
         """Check if a cell is clamped."""
-        return (row, col) in self.clamped
+        return bool(self._clamped_bytes[row * self.grid_size + col])
+    
+    def _argmax(self, row: int, col: int) -> int:
+        """Most likely value for a cell (1-indexed)."""
+        return int(np.argmax(self.probs[row, col])) + 1
     
     def get_most_likely_value(self, row: int, col: int) -> Dict:
         """
@@ -74,17 +404,16 @@ class NetworkSettling:
         Returns:
             Dict with 'value' (1-indexed) and 'probability'
         """
-        probs = self.probabilities[(row, col)]
-        max_prob = max(probs)
-        max_index = probs.index(max_prob)
+        probs = self.probs[row, col]
+        max_index = int(np.argmax(probs))
         return {
             'value': max_index + 1,  # Convert to 1-indexed
-            'probability': max_prob
+            'probability': float(probs[max_index])
         }
     
     def get_probabilities(self, row: int, col: int) -> List[float]:
         """Get probability distribution for a cell."""
-        return self.probabilities[(row, col)].copy()
+        return self.probs[row, col].tolist()
     
     def step(self) -> float:
         """
@@ -95,40 +424,142 @@ class NetworkSettling:
         """
         if self.is_converged:
             return 0.0
+        if not self.clamped_mask.any():
+            # Without clues every cell stays uniform, so skip the sweep
+            self.iteration += 1
+            self.is_converged = True
+            self._last_max_change = 0.0
+            return 0.0
         
-        new_probabilities = {}
-        max_change = 0.0
-        
-        # For each cell
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                # Skip clamped cells
-                if (row, col) in self.clamped:
-                    new_probabilities[(row, col)] = self.probabilities[(row, col)].copy()
-                    continue
-                
-                # Calculate new probabilities based on constraints
-                new_probs = self.calculate_new_probabilities(row, col)
-                new_probabilities[(row, col)] = new_probs
-                
-                # Track maximum change
-                change = self.calculate_change(
-                    self.probabilities[(row, col)], 
-                    new_probs
-                )
-                max_change = max(max_change, change)
-        
-        # Update probabilities
-        self.probabilities = new_probabilities
+        if self.schedule == 'residual':
+            max_change = self._step_residual()
+            self._sweep_residual.fill(_UNSETTLED)
+        else:
+            if self.schedule == 'random':
+                active = self._rng.random(self.clamped_mask.shape) < self.update_fraction
+            else:
+                active = self._all_active
+            eps = self.convergence_threshold / 10 if self.skip_settled else 0.0
+            max_change = float(self._settle(
+                self.probs, self.clamped_mask, active, self._impossible,
+                self._row_sum, self._col_sum,
+                self._live_in_row, self._live_in_col,
+                self._sweep_residual, eps,
+                self.inhibition_strength, self._probs_back
+            ))
+            
+            # Update probabilities
+            self.probs, self._probs_back = self._probs_back, self.probs
+            self._residual_heap = None
+            
+            if self.skip_settled:
+                # Cells sharing a row or column with a significant change
+                # are revisited next sweep; the rest may be skipped
+                hot = (self._sweep_residual >= eps) & ~self.clamped_mask
+                wake = hot.any(axis=1)[:, None] | hot.any(axis=0)[None, :]
+                self._sweep_residual[wake] = _UNSETTLED
+            else:
+                self._sweep_residual.fill(_UNSETTLED)
         self.iteration += 1
         
-        # Check for convergence
-        if max_change < self.convergence_threshold:
+        # Check for convergence; changes below the storage resolution
+        # cannot be told apart from rounding
+        threshold = max(self.convergence_threshold, float(np.finfo(self.dtype).eps))
+        if max_change < threshold:
             self.is_converged = True
+        self._last_max_change = max_change
         
         return max_change
     
-    def calculate_new_probabilities(self, row: int, col: int) -> List[float]:
+    def _step_residual(self) -> float:
+        """
+        Update cells in place, one at a time, largest residual first.
+        
+        Each update is immediately visible to the cells after it, and only
+        the cells sharing its row or column have their residuals refreshed.
+        """
+        live_count = int((~self.clamped_mask).sum())
+        if self._residual_heap is None:
+            self._residual.fill(0.0)
+            self._refresh_residuals(*np.nonzero(~self.clamped_mask))
+            self._rebuild_residual_heap()
+        elif len(self._residual_heap) > 4 * live_count:
+            # Drop superseded entries before the heap grows unbounded
+            self._rebuild_residual_heap()
+        
+        heap = self._residual_heap
+        budget = self.residual_batch or live_count
+        max_change = 0.0
+        while heap and budget > 0:
+            neg_residual, row, col = heapq.heappop(heap)
+            if -neg_residual != self._residual[row, col]:
+                continue  # Superseded by a later refresh
+            budget -= 1
+            
+            old_probs = self.probs[row, col].astype(np.float64)
+            self.probs[row, col] = self._updated_probs(np.array([row]), np.array([col]))[0]
+            delta = self.probs[row, col] - old_probs
+            self._row_sum[row] += delta
+            self._col_sum[col] += delta
+            max_change = max(max_change, float(np.abs(delta).max()))
+            
+            # Cells sharing the row or column now see different totals
+            live = ~self.clamped_mask
+            row_cols = np.flatnonzero(live[row])
+            col_rows = np.flatnonzero(live[:, col])
+            col_rows = col_rows[col_rows != row]
+            rows = np.concatenate([np.full(len(row_cols), row), col_rows])
+            cols = np.concatenate([row_cols, np.full(len(col_rows), col)])
+            for r, c, residual in zip(
+                rows.tolist(), cols.tolist(), self._refresh_residuals(rows, cols)
+            ):
+                heapq.heappush(heap, (-residual, r, c))
+        
+        return max_change
+    
+    def _rebuild_residual_heap(self):
+        """Heapify the stored residuals of all unclamped cells."""
+        rows, cols = np.nonzero(~self.clamped_mask)
+        self._residual_heap = [
+            (-residual, r, c) for r, c, residual in zip(
+                rows.tolist(), cols.tolist(), self._residual[rows, cols].tolist()
+            )
+        ]
+        heapq.heapify(self._residual_heap)
+    
+    def _refresh_residuals(self, rows: np.ndarray, cols: np.ndarray) -> List[float]:
+        """Store and return how much each given cell would change if updated."""
+        change = np.abs(
+            self._updated_probs(rows, cols) - self.probs[rows, cols]
+        ).max(axis=1).astype(np.float64)
+        self._residual[rows, cols] = change
+        return change.tolist()
+    
+    def _updated_probs(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Compute the settling update for the given (unclamped) cells from the
+        current row/column totals, as a (len(rows), grid_size) array.
+        """
+        probs = self.probs[rows, cols].astype(np.float32)
+        count = self._live_in_row[rows] + self._live_in_col[cols] - 2
+        scale = np.divide(
+            np.float32(self.inhibition_strength), count.astype(np.float32),
+            out=np.zeros(len(rows), dtype=np.float32), where=count > 0
+        )[:, None]
+        
+        inhibition = (self._row_sum[rows] + self._col_sum[cols]).astype(np.float32)
+        inhibition -= 2 * probs
+        new_probs = probs * (1 - inhibition * scale)
+        impossible = self._impossible[rows, cols][:, None] & _value_bits(self.grid_size)
+        new_probs[impossible != 0] = 0.0
+        np.maximum(new_probs, 0.0, out=new_probs)
+        
+        total = new_probs.sum(axis=1, keepdims=True)
+        np.divide(new_probs, total, out=new_probs, where=total > 0)
+        new_probs[total[:, 0] == 0] = 1.0 / self.grid_size
+        return new_probs
+    
+    def calculate_new_probabilities(self, row: int, col: int) -> np.ndarray:
         """
         Calculate new probabilities for a cell based on constraints.
         
@@ -136,9 +567,12 @@ class NetworkSettling:
         - Inhibitory connections reduce activation for conflicting values
         - Impossible values (clamped elsewhere) get probability 0
         - Probabilities are normalized to sum to 1
+        
+        step() applies the same update to the whole grid at once; this
+        computes it for a single cell.
         """
-        current_probs = self.probabilities[(row, col)]
-        new_probs = current_probs.copy()
+        current_probs = self.probs[row, col]
+        new_probs = current_probs.astype(np.float32)
         
         # For each possible value
         for value_idx in range(self.grid_size):
@@ -155,11 +589,8 @@ class NetworkSettling:
             new_probs[value_idx] = current_probs[value_idx] * (
                 1 - inhibition * self.inhibition_strength
             )
-            
-            # Ensure non-negative
-            new_probs[value_idx] = max(0.0, new_probs[value_idx])
         
-        # Normalize probabilities to sum to 1
+        # Clip to non-negative and normalize probabilities to sum to 1
         return self.normalize(new_probs)
     
     def is_value_impossible(self, row: int, col: int, value_idx: int) -> bool:
@@ -168,27 +599,7 @@ class NetworkSettling:
         
         This enforces hard constraints from external inputs.
         """
-        value = value_idx + 1  # Convert to 1-indexed
-        
-        # Check row for clamped cells with this value
-        for c in range(self.grid_size):
-            if c == col:
-                continue
-            if (row, c) in self.clamped:
-                clamped_value = self.get_most_likely_value(row, c)['value']
-                if clamped_value == value:
-                    return True
-        
-        # Check column for clamped cells with this value
-        for r in range(self.grid_size):
-            if r == row:
-                continue
-            if (r, col) in self.clamped:
-                clamped_value = self.get_most_likely_value(r, col)['value']
-                if clamped_value == value:
-                    return True
-        
-        return False
+        return bool((int(self._impossible[row, col]) >> value_idx) & 1)
     
     def calculate_inhibition(self, row: int, col: int, value_idx: int) -> float:
         """
@@ -198,50 +609,51 @@ class NetworkSettling:
         This implements the parallel constraint satisfaction through
         inhibitory connections between conflicting units.
         """
-        total_inhibition = 0.0
-        count = 0
-        
-        # Check row
-        for c in range(self.grid_size):
-            if c == col:
-                continue
-            if (row, c) not in self.clamped:
-                prob = self.probabilities[(row, c)][value_idx]
-                total_inhibition += prob
-                count += 1
-        
-        # Check column
-        for r in range(self.grid_size):
-            if r == row:
-                continue
-            if (r, col) not in self.clamped:
-                prob = self.probabilities[(r, col)][value_idx]
-                total_inhibition += prob
-                count += 1
+        # Row and column totals over unclamped cells, minus this cell's own
+        # contribution to each
+        own = 0 if self.is_clamped(row, col) else 1
+        total_inhibition = (
+            self._row_sum[row, value_idx] + self._col_sum[col, value_idx]
+            - 2 * own * self.probs[row, col, value_idx]
+        )
+        count = int(self._live_in_row[row] + self._live_in_col[col]) - 2 * own
         
         # Average inhibition (normalized)
         return total_inhibition / count if count > 0 else 0.0
     
-    def normalize(self, probs: List[float]) -> List[float]:
-        """Normalize probability distribution to sum to 1."""
-        total = sum(probs)
+    def normalize(self, probs: np.ndarray) -> np.ndarray:
+        """
+        Clip negative values and normalize a probability distribution to
+        sum to 1. float32 arrays are updated in place; anything else is
+        converted to a new float32 array first.
+        """
+        probs = np.asarray(probs, dtype=np.float32)
+        np.maximum(probs, 0.0, out=probs)
+        total = probs.sum()
         if total == 0:
             # If all probabilities are 0, distribute uniformly
-            return [1.0 / self.grid_size] * self.grid_size
-        return [p / total for p in probs]
+            probs.fill(1.0 / self.grid_size)
+        else:
+            probs /= total
+        return probs
     
-    def calculate_change(self, old_probs: List[float], new_probs: List[float]) -> float:
+    def calculate_change(self, old_probs: np.ndarray, new_probs: np.ndarray) -> float:
         """Calculate the maximum absolute change between two probability distributions."""
-        return max(abs(new - old) for old, new in zip(old_probs, new_probs))
+        return float(np.abs(np.subtract(new_probs, old_probs)).max())
     
     def reset(self):
         """Reset the network to initial state."""
-        self.clamped.clear()
+        self.clamped_mask.fill(False)
+        self._live_in_row.fill(self.grid_size)
+        self._live_in_col.fill(self.grid_size)
+        self._impossible.fill(0)
         self.initialize()
     
     def set_inhibition_strength(self, strength: float):
         """Set inhibition strength (0 to 1)."""
         self.inhibition_strength = max(0.0, min(1.0, strength))
+        self._residual_heap = None
+        self._sweep_residual.fill(_UNSETTLED)
     
     def get_state(self) -> Dict:
         """Get current state summary."""
@@ -249,124 +661,141 @@ class NetworkSettling:
             'iteration': self.iteration,
             'is_converged': self.is_converged,
             'grid_size': self.grid_size,
-            'clamped_count': len(self.clamped)
+            'clamped_count': int(self.clamped_mask.sum())
         }
     
     def is_valid_solution(self) -> bool:
         """Check if the current solution is valid (all constraints satisfied)."""
-        # Check each row
-        for row in range(self.grid_size):
-            values = set()
-            for col in range(self.grid_size):
-                result = self.get_most_likely_value(row, col)
-                if result['probability'] < 0.9:
-                    return False  # Not confident enough
-                if result['value'] in values:
-                    return False  # Duplicate in row
-                values.add(result['value'])
+        if (self.probs.max(axis=2) < 0.9).any():
+            return False  # Not confident enough
         
-        # Check each column
-        for col in range(self.grid_size):
-            values = set()
-            for row in range(self.grid_size):
-                result = self.get_most_likely_value(row, col)
-                if result['value'] in values:
-                    return False  # Duplicate in column
-                values.add(result['value'])
+        # Duplicates show up as equal neighbours once each row/column is sorted
+        grid = self.probs.argmax(axis=2)
+        if (np.diff(np.sort(grid, axis=1), axis=1) == 0).any():
+            return False  # Duplicate in row
+        if (np.diff(np.sort(grid, axis=0), axis=0) == 0).any():
+            return False  # Duplicate in column
         
         return True
     
     def get_grid(self) -> List[List[int]]:
         """Get grid as 2D array of most likely values."""
-        grid = []
-        for row in range(self.grid_size):
-            row_values = []
-            for col in range(self.grid_size):
-                value = self.get_most_likely_value(row, col)['value']
-                row_values.append(value)
-            grid.append(row_values)
-        return grid
+        return (self.probs.argmax(axis=2) + 1).tolist()
     
-    def to_json(self) -> str:
-        """Export current state as JSON for frontend."""
-        state = {
+    def _state_dict(self) -> Dict:
+        """
+        Build the state exported to the frontend.
+        
+        The arrays are flattened in row-major order: 'probabilities' is
+        float32 indexed [(row * N + col) * N + value_idx], while 'grid'
+        and 'clamped' are int8 indexed [row * N + col]. 'last_max_change'
+        is the largest change of the most recent step, so callers polling
+        the state can tell when the network has levelled off.
+        """
+        return {
             'grid_size': self.grid_size,
             'iteration': self.iteration,
             'is_converged': self.is_converged,
-            'probabilities': {},
-            'clamped': list(self.clamped),
-            'grid': self.get_grid()
+            'probabilities': np.ascontiguousarray(self.probs, dtype=np.float32).ravel(),
+            'clamped': self.clamped_mask.view(np.int8).ravel(),
+            'grid': (self.probs.argmax(axis=2) + 1).astype(np.int8).ravel(),
+            # None until a step has run since the clues last changed
+            'last_max_change': (
+                float(self._last_max_change)
+                if np.isfinite(self._last_max_change) else None
+            )
         }
-        
-        # Convert tuple keys to strings for JSON
-        for (row, col), probs in self.probabilities.items():
-            state['probabilities'][f"{row},{col}"] = probs
-        
-        return json.dumps(state)
+    
+    def to_json(self) -> str:
+        """Export current state as JSON for frontend."""
+        return _dumps(self._state_dict())
+
+
+def _dumps(state: Dict) -> str:
+    """Serialize a state dict to JSON, encoding NumPy arrays as lists."""
+    if orjson is not None:
+        return orjson.dumps(state, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(state, default=np.ndarray.tolist)
+
+
+def _export(state: Dict):
+    """
+    Hand a state dict to JavaScript.
+    
+    Under Pyodide this is a plain JS object whose arrays arrive as
+    Float32Array/Int8Array, copied straight from the NumPy buffers rather
+    than printed as text; elsewhere it is the JSON string from _dumps.
+    """
+    if to_js is not None:
+        return to_js(state, dict_converter=Object.fromEntries, create_pyproxies=False)
+    return _dumps(state)
 
 
 # API functions for JavaScript to call via Pyodide
 _network = None
 
+# Mutators only report success; callers fetch the state they need
+_OK = json.dumps({'status': 'ok'})
+_NOT_INITIALIZED = json.dumps({'error': 'Network not initialized'})
+
 
 def create_network(grid_size):
     """Create a new network."""
     global _network
     _network = NetworkSettling(grid_size)
-    return _network.to_json()
+    return _OK
 
 
 def set_clue(row, col, value):
     """Set a clue in the network."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
+        return _NOT_INITIALIZED
     _network.set_clue(row, col, value)
-    return _network.to_json()
+    return _OK
 
 
 def remove_clue(row, col):
     """Remove a clue from the network."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
+        return _NOT_INITIALIZED
     _network.remove_clue(row, col)
-    return _network.to_json()
+    return _OK
 
 
 def step():
     """Perform one step of settling."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
+        return _NOT_INITIALIZED
     max_change = _network.step()
-    result = json.loads(_network.to_json())
+    result = _network._state_dict()
     result['max_change'] = max_change
-    return json.dumps(result)
+    return _export(result)
 
 
 def reset():
     """Reset the network."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
+        return _NOT_INITIALIZED
     _network.reset()
-    return _network.to_json()
+    return _OK
 
 
 def set_inhibition(strength):
     """Set inhibition strength."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
+        return _NOT_INITIALIZED
     _network.set_inhibition_strength(strength)
-    return _network.to_json()
+    return _OK
 
 
 def get_state():
     """Get current state."""
     global _network
     if _network is None:
-        return json.dumps({'error': 'Network not initialized'})
-    return _network.to_json()
-
+        return _NOT_INITIALIZED
+    return _export(_network._state_dict())